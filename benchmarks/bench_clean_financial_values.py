@@ -0,0 +1,52 @@
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src' / 'scripts'))
+
+from utils.data_cleaner import DataCleaner
+
+TOKENS = ['$1,234', '(567)', '12.5%', '-', '—', '', 'N/A', '89,012', '(3,456)', '7', None]
+ROW_COUNTS = [30, 300, 30000]
+COLUMN_COUNT = 8
+REPEATS = 5
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    data = {f'col_{i}': rng.choice(np.array(TOKENS, dtype=object), size=rows)
+            for i in range(COLUMN_COUNT)}
+    return pd.DataFrame({'line_item': [f'Item {i}' for i in range(rows)], **data})
+
+def clean_with_apply(df: pd.DataFrame, value_columns: list) -> pd.DataFrame:
+    df_copy = df.copy()
+    for col in value_columns:
+        df_copy[col] = df_copy[col].apply(DataCleaner._clean_numeric_value)
+        df_copy[col] = pd.to_numeric(df_copy[col], errors='coerce')
+    return df_copy
+
+def best_time(func, *args) -> float:
+    number = max(1, 3000 // len(args[0]))
+    return min(timeit.repeat(lambda: func(*args), number=number, repeat=REPEATS)) / number
+
+def main():
+    print(f"clean_financial_values on {COLUMN_COUNT} object columns (best of {REPEATS})")
+    print(f"{'rows':>8} {'apply':>12} {'current':>12}")
+
+    for rows in ROW_COUNTS:
+        df = make_frame(rows)
+        value_columns = [col for col in df.columns if col != 'line_item']
+
+        pd.testing.assert_frame_equal(clean_with_apply(df, value_columns),
+                                      DataCleaner.clean_financial_values(df, value_columns))
+
+        apply_time = best_time(clean_with_apply, df, value_columns)
+        current_time = best_time(DataCleaner.clean_financial_values, df, value_columns)
+        print(f"{rows:>8} {apply_time * 1000:>10.2f}ms {current_time * 1000:>10.2f}ms")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,7 @@ import re
 sys.path.append(str(Path(__file__).parent))
 from utils.excel_parser import ExcelParser
 from utils.data_cleaner import DataCleaner
+from utils.output_writer import OutputWriter
 
 def extract_8k_data(excel_file: Path, metadata: dict) -> pd.DataFrame:
     parser = ExcelParser(str(excel_file))
@@ -74,10 +75,8 @@ def extract_8k_data(excel_file: Path, metadata: dict) -> pd.DataFrame:
     
     combined_df = pd.concat(all_data, ignore_index=True)
     
-    for key, value in metadata.items():
-        combined_df.insert(0, key, value)
-    
-    return combined_df
+    # Metadata columns lead in reverse key order, as repeated insert(0, ...) left them.
+    return DataCleaner.add_metadata_columns(combined_df, dict(reversed(metadata.items())))
 
 def _categorize_sheet(sheet_name: str) -> str:
     name_lower = sheet_name.lower()
@@ -139,6 +138,7 @@ def process_all_8k_files(input_dir: Path, output_file: Path) -> bool:
     
     output_file.parent.mkdir(parents=True, exist_ok=True)
     combined_df.to_csv(output_file, index=False)
+    OutputWriter.write_parquet(combined_df, output_file.with_suffix('.parquet'))
     
     print(f"\n✓ Successfully processed {processed_files}/{total_files} files")
     print(f"✓ Total rows extracted: {len(combined_df)}")
@@ -1,30 +1,64 @@
 
 import pandas as pd
+import numpy as np
+from pandas.api.types import union_categoricals
 import sys
 from pathlib import Path
 from datetime import datetime
 import re
+import logging
 
 sys.path.append(str(Path(__file__).parent))
 from utils.excel_parser import ExcelParser
 from utils.data_cleaner import DataCleaner
+from utils.output_writer import OutputWriter
+
+log = logging.getLogger(__name__)
+
+ANNUAL_REPORT_KEYWORDS = ('10-K', 'Annual report pursuant')
+
+HEADER_KEYWORDS = ('march', 'fiscal', 'year ended', '2020', '2021',
+                   '2022', '2023', '2024', '2025')
+HEADER_SCAN_ROWS = 20
+
+YEAR_PATTERN = re.compile(r'(20\d{2})')
+COLUMN_NAME_STRIP_PATTERN = re.compile(r'[^\w\s\-/]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+STATEMENT_SPECS = [
+    ('balance_sheet', 'balance_sheets', 3, 'balance sheet'),
+    ('income_statement', 'income_statements', 3, 'income statement'),
+    ('cash_flow', 'cash_flows', 3, 'cash flow'),
+    ('comprehensive_income', 'comprehensive_income', 2, 'comprehensive income'),
+    ('equity', 'equity_statements', 2, 'equity statement'),
+]
+
+def find_header_row(df: pd.DataFrame) -> int:
+    cells = np.char.lower(df.head(HEADER_SCAN_ROWS).to_numpy(dtype=str, na_value=''))
+    hits = np.zeros(cells.shape[0], dtype=bool)
+    for kw in HEADER_KEYWORDS:
+        hits |= (np.char.find(cells, kw) >= 0).any(axis=1)
+    return df.index[hits.argmax()] if hits.any() else 0
+
+def read_clean_sheet(parser: ExcelParser, sheet_name: str) -> pd.DataFrame:
+    df = parser.read_sheet(sheet_name)
+    return DataCleaner.remove_empty_rows_and_columns(df, threshold=0.3)
 
 def extract_financial_table(df: pd.DataFrame, 
                             table_type: str,
                             sheet_name: str,
-                            metadata: dict) -> pd.DataFrame:
-    df = DataCleaner.remove_empty_rows_and_columns(df, threshold=0.3)
+                            metadata: dict,
+                            skip_clean: bool = False) -> pd.DataFrame:
+    if not skip_clean:
+        df = DataCleaner.remove_empty_rows_and_columns(df, threshold=0.3)
     
     if df.empty or df.shape[0] < 2:
         return pd.DataFrame()
     
-    header_row = 0
-    for idx, row in df.iterrows():
-        row_str = ' '.join([str(val).lower() for val in row if pd.notna(val)])
-        if any(kw in row_str for kw in ['march', 'fiscal', 'year ended', '2020', '2021', 
-                                         '2022', '2023', '2024', '2025']):
-            header_row = idx
-            break
+    header_row = find_header_row(df)
+    if header_row >= len(df):
+        print(f"    Warning: Skipping '{sheet_name}': header row is past the end of the table")
+        return pd.DataFrame()
     
     if header_row > 0:
         df.columns = df.iloc[header_row]
@@ -33,115 +67,86 @@ def extract_financial_table(df: pd.DataFrame,
     if df.empty:
         return pd.DataFrame()
     
-    new_columns = []
-    for i, col in enumerate(df.columns):
-        if i == 0:
-            new_columns.append('line_item')
+    new_columns = [None] * len(df.columns)
+    new_columns[0] = 'line_item'
+    for i, col in enumerate(df.columns[1:], start=1):
+        col_str = str(col).strip()
+        if pd.isna(col) or col_str in ['', 'nan', 'None']:
+            new_columns[i] = f'year_{i}'
         else:
-            col_str = str(col).strip()
-            if pd.isna(col) or col_str in ['', 'nan', 'None']:
-                new_columns.append(f'year_{i}')
+            year_match = YEAR_PATTERN.search(col_str)
+            if year_match:
+                new_columns[i] = f'fy_{year_match.group(1)}'
             else:
-                year_match = re.search(r'(20\d{2})', col_str)
-                if year_match:
-                    new_columns.append(f'fy_{year_match.group(1)}')
-                else:
-                    clean_name = re.sub(r'[^\w\s\-/]', '', col_str)
-                    clean_name = re.sub(r'\s+', '_', clean_name)
-                    new_columns.append(clean_name.lower()[:50]) 
+                clean_name = COLUMN_NAME_STRIP_PATTERN.sub('', col_str)
+                clean_name = WHITESPACE_PATTERN.sub('_', clean_name)
+                new_columns[i] = clean_name.lower()[:50]
     
     df.columns = new_columns
+    if df.columns.duplicated().any():
+        print(f"    Warning: Skipping '{sheet_name}': duplicate column names")
+        return pd.DataFrame()
     
-    df = df[df['line_item'].notna()]
-    df = df[df['line_item'].astype(str).str.strip() != '']
+    line_items = df['line_item'].astype('string')
+    df = df.loc[line_items.notna() & (line_items.str.strip() != '')]
     
     numeric_cols = [col for col in df.columns if col != 'line_item']
     df = DataCleaner.clean_financial_values(df, value_columns=numeric_cols)
     
     df = DataCleaner.normalize_item_names(df, item_column='line_item')
+    df['line_item'] = df['line_item'].astype('category')
     
-    df.insert(0, 'sheet_name', sheet_name)
-    df.insert(0, 'statement_type', table_type)
-    for key, value in reversed(list(metadata.items())):
-        df.insert(0, key, value)
-    
-    return df
+    return DataCleaner.add_metadata_columns(df, {**metadata, 'statement_type': table_type,
+                                                 'sheet_name': sheet_name})
+
+def concat_statements(frames: list) -> pd.DataFrame:
+    if all('line_item' in df.columns for df in frames):
+        categories = union_categoricals([df['line_item'] for df in frames]).categories
+        frames = [df.assign(line_item=df['line_item'].cat.set_categories(categories))
+                  for df in frames]
+    return pd.concat(frames, ignore_index=True)
 
 def extract_annual_report(excel_file: Path) -> dict:
-    parser = ExcelParser(str(excel_file))
-    metadata = parser.extract_metadata_from_filename()
-    metadata['source_file'] = excel_file.name
-    
-    categories = parser.find_financial_statement_sheets()
-    
-    results = {
-        'balance_sheets': [],
-        'income_statements': [],
-        'cash_flows': [],
-        'comprehensive_income': [],
-        'equity_statements': [],
-        'compensation': []
-    }
-    
-    for sheet_name in categories['balance_sheet'][:3]: 
-        try:
-            df = parser.read_sheet(sheet_name)
-            df_clean = extract_financial_table(df, 'balance_sheet', sheet_name, metadata)
-            if not df_clean.empty:
-                results['balance_sheets'].append(df_clean)
-        except Exception as e:
-            print(f"    Warning: Error processing balance sheet '{sheet_name}': {e}")
-    
-    for sheet_name in categories['income_statement'][:3]:
-        try:
-            df = parser.read_sheet(sheet_name)
-            df_clean = extract_financial_table(df, 'income_statement', sheet_name, metadata)
-            if not df_clean.empty:
-                results['income_statements'].append(df_clean)
-        except Exception as e:
-            print(f"    Warning: Error processing income statement '{sheet_name}': {e}")
-    
-    for sheet_name in categories['cash_flow'][:3]:
-        try:
-            df = parser.read_sheet(sheet_name)
-            df_clean = extract_financial_table(df, 'cash_flow', sheet_name, metadata)
-            if not df_clean.empty:
-                results['cash_flows'].append(df_clean)
-        except Exception as e:
-            print(f"    Warning: Error processing cash flow '{sheet_name}': {e}")
-    
-    for sheet_name in categories['comprehensive_income'][:2]:
-        try:
-            df = parser.read_sheet(sheet_name)
-            df_clean = extract_financial_table(df, 'comprehensive_income', sheet_name, metadata)
-            if not df_clean.empty:
-                results['comprehensive_income'].append(df_clean)
-        except Exception as e:
-            print(f"    Warning: Error processing comprehensive income '{sheet_name}': {e}")
-    
-    for sheet_name in categories['equity'][:2]:
-        try:
-            df = parser.read_sheet(sheet_name)
-            df_clean = extract_financial_table(df, 'equity', sheet_name, metadata)
-            if not df_clean.empty:
-                results['equity_statements'].append(df_clean)
-        except Exception as e:
-            print(f"    Warning: Error processing equity statement '{sheet_name}': {e}")
-    
-    for sheet_name in categories['compensation']:
-        try:
-            df = parser.read_sheet(sheet_name)
-            df = DataCleaner.remove_empty_rows_and_columns(df, threshold=0.3)
+    with ExcelParser(str(excel_file)) as parser:
+        metadata = parser.extract_metadata_from_filename()
+        metadata['source_file'] = excel_file.name
+        
+        categories = parser.find_financial_statement_sheets()
+        
+        results = {
+            'balance_sheets': [],
+            'income_statements': [],
+            'cash_flows': [],
+            'comprehensive_income': [],
+            'equity_statements': [],
+            'compensation': []
+        }
+        
+        for table_type, result_key, max_sheets, label in STATEMENT_SPECS:
+            for sheet_name in categories[table_type][:max_sheets]:
+                try:
+                    df = read_clean_sheet(parser, sheet_name)
+                    df_clean = extract_financial_table(df, table_type, sheet_name, metadata,
+                                                       skip_clean=True)
+                except Exception as e:
+                    print(f"    Warning: Error processing {label} '{sheet_name}': {e}")
+                    continue
+                
+                if not df_clean.empty:
+                    results[result_key].append(df_clean)
+        
+        for sheet_name in categories['compensation']:
+            try:
+                df = read_clean_sheet(parser, sheet_name)
+            except Exception as e:
+                print(f"    Warning: Error processing compensation '{sheet_name}': {e}")
+                continue
+            
             if not df.empty and df.shape[0] > 2:
-                df.insert(0, 'sheet_name', sheet_name)
-                df.insert(0, 'statement_type', 'compensation')
-                for key, value in reversed(list(metadata.items())):
-                    df.insert(0, key, value)
+                df = DataCleaner.add_metadata_columns(df, {**metadata, 'statement_type': 'compensation',
+                                                           'sheet_name': sheet_name})
                 results['compensation'].append(df)
-        except Exception as e:
-            print(f"    Warning: Error processing compensation '{sheet_name}': {e}")
     
-    parser.close()
     return results
 
 def process_all_annual_reports(input_dir: Path, output_dir: Path) -> bool:
@@ -164,8 +169,8 @@ def process_all_annual_reports(input_dir: Path, output_dir: Path) -> bool:
         year = year_dir.name
         print(f"\nProcessing year: {year}")
         
-        excel_files = [f for f in sorted(list(year_dir.glob("*.xlsx"))) 
-                      if '10-K' in f.name or 'Annual report pursuant' in f.name]
+        excel_files = sorted(f for f in year_dir.glob("*.xlsx")
+                             if any(kw in f.name for kw in ANNUAL_REPORT_KEYWORDS))
         total_files += len(excel_files)
         
         for excel_file in excel_files:
@@ -190,64 +195,77 @@ def process_all_annual_reports(input_dir: Path, output_dir: Path) -> bool:
                 processed_files += 1
                 print(f"    ✓ Extracted data")
                 
-            except Exception as e:
-                print(f"    ✗ Error: {str(e)}")
-                import traceback
-                traceback.print_exc()
+            except Exception:
+                log.exception("    ✗ Error processing %s", excel_file.name)
                 continue
     
     output_dir.mkdir(parents=True, exist_ok=True)
     
     files_created = 0
+    statement_frames = []
     
     if all_balance_sheets:
-        df = pd.concat(all_balance_sheets, ignore_index=True)
+        df = concat_statements(all_balance_sheets)
         output_file = output_dir / "balance_sheets.csv"
         df.to_csv(output_file, index=False)
+        statement_frames.append(df)
         print(f"\n✓ Balance sheets: {len(df)} rows -> {output_file}")
         files_created += 1
     
     if all_income_statements:
-        df = pd.concat(all_income_statements, ignore_index=True)
+        df = concat_statements(all_income_statements)
         output_file = output_dir / "income_statements.csv"
         df.to_csv(output_file, index=False)
+        statement_frames.append(df)
         print(f"✓ Income statements: {len(df)} rows -> {output_file}")
         files_created += 1
     
     if all_cash_flows:
-        df = pd.concat(all_cash_flows, ignore_index=True)
+        df = concat_statements(all_cash_flows)
         output_file = output_dir / "cash_flows.csv"
         df.to_csv(output_file, index=False)
+        statement_frames.append(df)
         print(f"✓ Cash flows: {len(df)} rows -> {output_file}")
         files_created += 1
     
     if all_comprehensive_income:
-        df = pd.concat(all_comprehensive_income, ignore_index=True)
+        df = concat_statements(all_comprehensive_income)
         output_file = output_dir / "comprehensive_income.csv"
         df.to_csv(output_file, index=False)
+        statement_frames.append(df)
         print(f"✓ Comprehensive income: {len(df)} rows -> {output_file}")
         files_created += 1
     
     if all_equity_statements:
-        df = pd.concat(all_equity_statements, ignore_index=True)
+        df = concat_statements(all_equity_statements)
         output_file = output_dir / "equity_statements.csv"
         df.to_csv(output_file, index=False)
+        statement_frames.append(df)
         print(f"✓ Equity statements: {len(df)} rows -> {output_file}")
         files_created += 1
     
     if all_compensation:
-        df = pd.concat(all_compensation, ignore_index=True)
+        df = concat_statements(all_compensation)
         output_file = output_dir / "compensation_data.csv"
         df.to_csv(output_file, index=False)
+        statement_frames.append(df)
         print(f"✓ Compensation data: {len(df)} rows -> {output_file}")
         files_created += 1
     
+    if statement_frames:
+        output_path = output_dir / "annual_reports.parquet"
+        OutputWriter.write_parquet_dataset(pd.concat(statement_frames, ignore_index=True),
+                                           output_path, partition_cols=['statement_type'])
+        print(f"✓ Parquet dataset partitioned by statement_type -> {output_path}")
+    
     print(f"\n✓ Successfully processed {processed_files}/{total_files} files")
     print(f"✓ Created {files_created} output files")
     
     return files_created > 0
 
 def main():
+    logging.basicConfig(format='%(message)s')
+    
     project_root = Path(__file__).parent.parent.parent
     input_dir = project_root / "data/raw/annual reports"
     output_dir = project_root / "data/processed/annual_reports"
@@ -4,56 +4,97 @@ import sys
 from pathlib import Path
 from datetime import datetime
 import re
+import bisect
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
 
 sys.path.append(str(Path(__file__).parent))
 from utils.excel_parser import ExcelParser
 from utils.data_cleaner import DataCleaner
+from utils.output_writer import OutputWriter
+from utils.extraction_cache import ExtractionCache
+
+log = logging.getLogger(__name__)
+
+STATEMENT_KEYWORDS = {
+    'balance_sheet': ['assets', 'liabilities', 'cash and cash equivalents', 
+                      'accounts receivable', 'inventories', 'stockholders equity',
+                      'property and equipment', 'current assets'],
+    'income_statement': ['net revenues', 'revenue', 'cost of revenues', 'gross profit',
+                         'operating expenses', 'research and development',
+                         'selling, general and administrative', 'net income', 'net loss',
+                         'loss from operations', 'income from operations'],
+    'cash_flow': ['cash flows', 'operating activities', 'investing activities',
+                  'financing activities', 'net increase', 'net decrease',
+                  'depreciation', 'capital expenditures'],
+    'equity': ['common stock', 'additional paid-in capital', 'retained earnings',
+               'accumulated other comprehensive', 'treasury stock',
+               'stock-based compensation expense', 'issuance of common stock'],
+    'comprehensive_income': ['comprehensive income', 'comprehensive loss', 
+                             'unrealized gain', 'unrealized loss']
+}
+
+# Lookahead alternation so keywords nested inside longer ones (e.g. 'revenue'
+# in 'net revenues') are still counted, matching the per-keyword `in` checks.
+STATEMENT_KEYWORD_PATTERNS = {
+    stmt_type: re.compile('(?=(' + '|'.join(map(re.escape, kws)) + '))', re.IGNORECASE)
+    for stmt_type, kws in STATEMENT_KEYWORDS.items()
+}
+
+CLASSIFY_MAX_ROWS = 200
+SHEET_TEXT_SEPARATOR = '\n<<SHEET>>\n'
+
+HEADER_CONTEXT_PATTERN = re.compile(r'march|year ended|fiscal')
+HEADER_YEARS = frozenset(f'20{y}' for y in range(20, 26))
+EMPTY_COLUMN_LABELS = frozenset(['', 'nan', 'None', '​'])
+YEAR_PATTERN = re.compile(r'(20\d{2})')
+NON_WORD_PATTERN = re.compile(r'[^\w\s]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+PUNCTUATION_ONLY_PATTERN = re.compile(r'^[^\w]+$')
+SKIP_SHEET_PATTERN = re.compile(r'exhibit|No Title|note|Note|accounting pronouncements|'
+                                r'fair value measurement|stock pu|compensation')
+
+CACHE_VERSION = 3
+
+OUTPUT_SPECS = [
+    ('balance_sheets', 'balance_sheets_v2.csv', 'Balance sheet', 'Balance sheets'),
+    ('income_statements', 'income_statements_v2.csv', 'Income statement', 'Income statements'),
+    ('cash_flows', 'cash_flows_v2.csv', 'Cash flow', 'Cash flows'),
+    ('comprehensive_income', 'comprehensive_income_v2.csv', 'Comprehensive income', 'Comprehensive income'),
+    ('equity_statements', 'equity_statements_v2.csv', 'Equity', 'Equity statements'),
+]
+
+def classify_sheets(frames: dict) -> dict:
+    names = [name for name, df in frames.items() if not df.empty and df.shape[0] >= 3]
+    texts = [frames[name].iloc[:CLASSIFY_MAX_ROWS, 0].astype(str).str.cat(sep=' ')
+             for name in names]
+    
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text) + len(SHEET_TEXT_SEPARATOR)
+    all_text = SHEET_TEXT_SEPARATOR.join(texts)
+    
+    found = {name: {stmt_type: set() for stmt_type in STATEMENT_KEYWORD_PATTERNS} 
+             for name in names}
+    for stmt_type, pattern in STATEMENT_KEYWORD_PATTERNS.items():
+        for match in pattern.finditer(all_text):
+            name = names[bisect.bisect_right(starts, match.start()) - 1]
+            found[name][stmt_type].add(match.group(1).lower())
+    
+    stmt_types = {name: 'unknown' for name in frames}
+    for name, keywords in found.items():
+        scores = {stmt_type: len(kws) for stmt_type, kws in keywords.items()}
+        max_type = max(scores, key=scores.get)
+        if scores[max_type] >= 2:
+            stmt_types[name] = max_type
+    
+    return stmt_types
 
 def detect_statement_type_by_content(df: pd.DataFrame, sheet_name: str) -> str:
-    if df.empty or df.shape[0] < 3:
-        return 'unknown'
-    
-    first_col = df.iloc[:, 0].astype(str).str.lower()
-    all_text = ' '.join(first_col.tolist())
-    
-    scores = {
-        'balance_sheet': 0,
-        'income_statement': 0,
-        'cash_flow': 0,
-        'equity': 0,
-        'comprehensive_income': 0
-    }
-    
-    bs_keywords = ['assets', 'liabilities', 'cash and cash equivalents', 
-                   'accounts receivable', 'inventories', 'stockholders equity',
-                   'property and equipment', 'current assets']
-    scores['balance_sheet'] = sum(1 for kw in bs_keywords if kw in all_text)
-    
-    is_keywords = ['net revenues', 'revenue', 'cost of revenues', 'gross profit',
-                   'operating expenses', 'research and development',
-                   'selling, general and administrative', 'net income', 'net loss',
-                   'loss from operations', 'income from operations']
-    scores['income_statement'] = sum(1 for kw in is_keywords if kw in all_text)
-    
-    cf_keywords = ['cash flows', 'operating activities', 'investing activities',
-                   'financing activities', 'net increase', 'net decrease',
-                   'depreciation', 'capital expenditures']
-    scores['cash_flow'] = sum(1 for kw in cf_keywords if kw in all_text)
-    
-    eq_keywords = ['common stock', 'additional paid-in capital', 'retained earnings',
-                   'accumulated other comprehensive', 'treasury stock',
-                   'stock-based compensation expense', 'issuance of common stock']
-    scores['equity'] = sum(1 for kw in eq_keywords if kw in all_text)
-    
-    ci_keywords = ['comprehensive income', 'comprehensive loss', 
-                   'unrealized gain', 'unrealized loss']
-    scores['comprehensive_income'] = sum(1 for kw in ci_keywords if kw in all_text)
-    
-    max_type = max(scores, key=scores.get)
-    if scores[max_type] >= 2:
-        return max_type
-    
-    return 'unknown'
+    return classify_sheets({sheet_name: df})[sheet_name]
 
 def extract_financial_table_v2(df: pd.DataFrame, 
                                table_type: str,
@@ -65,12 +106,13 @@ def extract_financial_table_v2(df: pd.DataFrame,
     if df.empty or df.shape[0] < 2:
         return pd.DataFrame()
     
+    # Statement headers sit in the first few rows, so stop at the first match
+    # rather than joining the text of every row.
     header_row = 0
-    for idx, row in df.iterrows():
+    for idx, row in zip(df.index, df.to_numpy(dtype=object)):
         row_str = ' '.join([str(val).lower() for val in row if pd.notna(val)])
-        has_context = any(pattern in row_str for pattern in ['march', 'year ended', 'fiscal'])
-        has_multiple_years = sum(1 for y in ['2020', '2021', '2022', '2023', '2024', '2025'] 
-                                if y in row_str) >= 2
+        has_context = HEADER_CONTEXT_PATTERN.search(row_str) is not None
+        has_multiple_years = sum(1 for y in HEADER_YEARS if y in row_str) >= 2
         
         if has_context or has_multiple_years:
             header_row = idx
@@ -89,44 +131,43 @@ def extract_financial_table_v2(df: pd.DataFrame,
             new_columns.append('line_item')
         else:
             col_str = str(col).strip()
-            year_match = re.search(r'(20\d{2})', col_str)
+            year_match = YEAR_PATTERN.search(col_str)
             if year_match:
                 new_columns.append(f'fy_{year_match.group(1)}')
-            elif pd.isna(col) or col_str in ['', 'nan', 'None', '​']:
+            elif pd.isna(col) or col_str in EMPTY_COLUMN_LABELS:
                 new_columns.append(f'col_{i}')
             else:
-                clean_name = re.sub(r'[^\w\s]', '', col_str)
-                clean_name = re.sub(r'\s+', '_', clean_name).lower()[:30]
+                clean_name = NON_WORD_PATTERN.sub('', col_str)
+                clean_name = WHITESPACE_PATTERN.sub('_', clean_name).lower()[:30]
                 new_columns.append(clean_name if clean_name else f'col_{i}')
     
     df.columns = new_columns
     
-    df = df[df['line_item'].notna()]
-    df['line_item'] = df['line_item'].astype(str).str.strip()
-    df = df[df['line_item'] != '']
-    df = df[~df['line_item'].str.match(r'^[^\w]+$')] 
+    line_items = df['line_item'].astype(str).str.strip()
+    keep = (df['line_item'].notna() & (line_items != '')
+            & ~line_items.str.match(PUNCTUATION_ONLY_PATTERN))
+    df = df.loc[keep].assign(line_item=line_items[keep])
     
     numeric_cols = [col for col in df.columns if col != 'line_item']
     df = DataCleaner.clean_financial_values(df, value_columns=numeric_cols)
     
-    df.insert(0, 'sheet_name', sheet_name)
-    df.insert(0, 'statement_type', table_type)
-    
+    fixed_columns = {'statement_type': table_type, 'sheet_name': sheet_name}
     if 'year' not in df.columns:
-        df.insert(0, 'year', year)
+        fixed_columns = {'year': year, **fixed_columns}
     
-    for key, value in reversed(list(metadata.items())):
-        if key not in df.columns:  
-            df.insert(0, key, value)
+    prefix = {key: value for key, value in metadata.items()
+              if key not in df.columns and key not in fixed_columns}
+    prefix.update(fixed_columns)
     
-    return df
+    return pd.concat([pd.DataFrame(prefix, index=df.index), df], axis=1)
 
-def extract_annual_report_v2(excel_file: Path) -> dict:
+def extract_annual_report_v2(excel_file: Path, year: int = None) -> dict:
     parser = ExcelParser(str(excel_file))
     metadata = parser.extract_metadata_from_filename()
     metadata['source_file'] = excel_file.name
     
-    year = int(metadata['year']) if metadata['year'] else 2020
+    if year is None:
+        year = int(metadata['year']) if metadata['year'] else 2020
     
     results = {
         'balance_sheets': [],
@@ -136,23 +177,31 @@ def extract_annual_report_v2(excel_file: Path) -> dict:
         'equity_statements': []
     }
     
-    for sheet_name in parser.get_sheet_names():
+    sheet_names = [name for name in parser.get_sheet_names()
+                   if not SKIP_SHEET_PATTERN.search(name)]
+    
+    frames = {}
+    for sheet_name in sheet_names:
         try:
-            skip_keywords = ['exhibit', 'No Title', 'note', 'Note', 'accounting pronouncements',
-                           'fair value measurement', 'stock pu', 'compensation']
-            if any(kw in sheet_name for kw in skip_keywords):
-                continue
-            
             df = parser.read_sheet(sheet_name)
-            
-            if df.shape[0] < 3 or df.shape[1] < 2:
-                continue
-            
-            stmt_type = detect_statement_type_by_content(df, sheet_name)
-            
-            if stmt_type == 'unknown':
-                continue
-            
+        except Exception as e:
+            print(f"    Warning: Error processing sheet '{sheet_name}': {e}")
+            continue
+        
+        if df.shape[0] < 3 or df.shape[1] < 2:
+            continue
+        
+        frames[sheet_name] = df
+    
+    stmt_types = classify_sheets(frames)
+    
+    for sheet_name, df in frames.items():
+        stmt_type = stmt_types[sheet_name]
+        
+        if stmt_type == 'unknown':
+            continue
+        
+        try:
             df_clean = extract_financial_table_v2(df, stmt_type, sheet_name, metadata, year)
             
             if df_clean.empty:
@@ -176,97 +225,75 @@ def extract_annual_report_v2(excel_file: Path) -> dict:
     parser.close()
     return results
 
-def process_all_annual_reports_v2(input_dir: Path, output_dir: Path) -> bool:
-    all_balance_sheets = []
-    all_income_statements = []
-    all_cash_flows = []
-    all_comprehensive_income = []
-    all_equity_statements = []
-    
-    total_files = 0
+def cached_extract_annual_report_v2(excel_file: Path, year: int = None,
+                                    cache_dir: Path = None) -> dict:
+    return ExtractionCache.load_or_extract(cache_dir, CACHE_VERSION,
+                                           extract_annual_report_v2, excel_file, year)
+
+def _folder_year(excel_file: Path) -> int:
+    folder = excel_file.parent.name
+    return int(folder) if len(folder) == 4 and folder.isdigit() else None
+
+def process_all_annual_reports_v2(input_dir: Path, output_dir: Path,
+                                  cache_dir: Path = None) -> bool:
     processed_files = 0
     
-    year_dirs = sorted([d for d in input_dir.iterdir() if d.is_dir()],
-                      key=lambda x: x.name)
+    with os.scandir(input_dir) as entries:
+        year_dirs = sorted([e for e in entries if e.is_dir()], key=lambda e: e.name)
     
     print(f"Found {len(year_dirs)} year directories")
     
+    excel_files = []
     for year_dir in year_dirs:
-        year = year_dir.name
-        print(f"\nProcessing year: {year}")
-        
-        excel_files = [f for f in sorted(list(year_dir.glob("*.xlsx"))) 
-                      if '10-K' in f.name or 'Annual report pursuant' in f.name]
-        total_files += len(excel_files)
+        with os.scandir(year_dir.path) as entries:
+            excel_files.extend(sorted(Path(e.path) for e in entries
+                                      if e.name.endswith('.xlsx')
+                                      and ('10-K' in e.name or 'Annual report pursuant' in e.name)))
+    total_files = len(excel_files)
+    
+    all_results = {key: [] for key, _, _, _ in OUTPUT_SPECS}
+    
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = [executor.submit(cached_extract_annual_report_v2, f, _folder_year(f), cache_dir)
+                   for f in excel_files]
         
-        for excel_file in excel_files:
+        current_year = None
+        for excel_file, future in zip(excel_files, futures):
+            if excel_file.parent.name != current_year:
+                current_year = excel_file.parent.name
+                print(f"\nProcessing year: {current_year}")
+            
             try:
                 print(f"  Processing: {excel_file.name}")
                 
-                results = extract_annual_report_v2(excel_file)
+                results = future.result()
                 
-                if results['balance_sheets']:
-                    all_balance_sheets.extend(results['balance_sheets'])
-                    print(f"    ✓ Balance sheet: {len(results['balance_sheets'])} sheet(s)")
-                if results['income_statements']:
-                    all_income_statements.extend(results['income_statements'])
-                    print(f"    ✓ Income statement: {len(results['income_statements'])} sheet(s)")
-                if results['cash_flows']:
-                    all_cash_flows.extend(results['cash_flows'])
-                    print(f"    ✓ Cash flow: {len(results['cash_flows'])} sheet(s)")
-                if results['comprehensive_income']:
-                    all_comprehensive_income.extend(results['comprehensive_income'])
-                    print(f"    ✓ Comprehensive income: {len(results['comprehensive_income'])} sheet(s)")
-                if results['equity_statements']:
-                    all_equity_statements.extend(results['equity_statements'])
-                    print(f"    ✓ Equity: {len(results['equity_statements'])} sheet(s)")
+                for key, _, sheet_label, _ in OUTPUT_SPECS:
+                    if results[key]:
+                        all_results[key].extend(results[key])
+                        print(f"    ✓ {sheet_label}: {len(results[key])} sheet(s)")
                 
                 processed_files += 1
                 
-            except Exception as e:
-                print(f"    ✗ Error: {str(e)}")
-                import traceback
-                traceback.print_exc()
+            except Exception:
+                log.exception("    ✗ Error processing %s", excel_file.name)
                 continue
     
     output_dir.mkdir(parents=True, exist_ok=True)
     
     files_created = 0
     
-    if all_balance_sheets:
-        df = pd.concat(all_balance_sheets, ignore_index=True)
-        output_file = output_dir / "balance_sheets_v2.csv"
-        df.to_csv(output_file, index=False)
-        print(f"\n✓ Balance sheets: {len(df)} rows -> {output_file}")
-        files_created += 1
-    
-    if all_income_statements:
-        df = pd.concat(all_income_statements, ignore_index=True)
-        output_file = output_dir / "income_statements_v2.csv"
-        df.to_csv(output_file, index=False)
-        print(f"✓ Income statements: {len(df)} rows -> {output_file}")
-        files_created += 1
-    
-    if all_cash_flows:
-        df = pd.concat(all_cash_flows, ignore_index=True)
-        output_file = output_dir / "cash_flows_v2.csv"
-        df.to_csv(output_file, index=False)
-        print(f"✓ Cash flows: {len(df)} rows -> {output_file}")
-        files_created += 1
-    
-    if all_comprehensive_income:
-        df = pd.concat(all_comprehensive_income, ignore_index=True)
-        output_file = output_dir / "comprehensive_income_v2.csv"
-        df.to_csv(output_file, index=False)
-        print(f"✓ Comprehensive income: {len(df)} rows -> {output_file}")
-        files_created += 1
-    
-    if all_equity_statements:
-        df = pd.concat(all_equity_statements, ignore_index=True)
-        output_file = output_dir / "equity_statements_v2.csv"
-        df.to_csv(output_file, index=False)
-        print(f"✓ Equity statements: {len(df)} rows -> {output_file}")
-        files_created += 1
+    print()
+    for key, filename, _, output_label in OUTPUT_SPECS:
+        if all_results[key]:
+            df = pd.concat(all_results[key], ignore_index=True)
+            output_file = output_dir / filename
+            parquet_file = output_file.with_suffix('.parquet')
+            df.to_csv(output_file, index=False)
+            OutputWriter.write_parquet(df, parquet_file)
+            print(f"✓ {output_label}: {len(df)} rows -> {output_file}")
+            print(f"  Parquet: {parquet_file}")
+            files_created += 1
     
     print(f"\n✓ Successfully processed {processed_files}/{total_files} files")
     print(f"✓ Created {files_created} output files")
@@ -274,9 +301,12 @@ def process_all_annual_reports_v2(input_dir: Path, output_dir: Path) -> bool:
     return files_created > 0
 
 def main():
+    logging.basicConfig(format='%(message)s')
+    
     project_root = Path(__file__).parent.parent.parent
     input_dir = project_root / "data/raw/annual reports"
     output_dir = project_root / "data/processed/annual_reports"
+    cache_dir = project_root / "data/.cache/annual_reports_v2"
     
     print("=" * 80)
     print("GSI Technology - IMPROVED Annual Reports (10-K) Extraction")
@@ -288,7 +318,7 @@ def main():
         print(f"Error: Input directory not found: {input_dir}")
         return 1
     
-    success = process_all_annual_reports_v2(input_dir, output_dir)
+    success = process_all_annual_reports_v2(input_dir, output_dir, cache_dir)
     
     print()
     print("=" * 80)
@@ -3,10 +3,14 @@ import pandas as pd
 import sys
 from pathlib import Path
 from datetime import datetime
+import logging
 
 sys.path.append(str(Path(__file__).parent))
 from utils.excel_parser import ExcelParser
 from utils.data_cleaner import DataCleaner
+from utils.output_writer import OutputWriter
+
+log = logging.getLogger(__name__)
 
 def extract_market_data(input_file: str, output_file: str) -> bool:
     try:
@@ -22,24 +26,21 @@ def extract_market_data(input_file: str, output_file: str) -> bool:
         
         df = DataCleaner.remove_empty_rows_and_columns(df, threshold=0.5)
         
-        df.columns = [col.strip().lower().replace('/', '_').replace(' ', '_') 
-                     for col in df.columns]
-        
-        if 'close_price' in df.columns:
-            df.rename(columns={'close_price': 'close'}, inplace=True)
+        df.columns = df.columns.str.strip().str.lower().str.replace(r'[/ ]', '_', regex=True)
+        df = df.rename(columns={'close_price': 'close'})
         
         if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'], errors='coerce')
-            df = df.sort_values('date')
+            if not pd.api.types.is_datetime64_any_dtype(df['date']):
+                df['date'] = pd.to_datetime(df['date'], errors='coerce')
+            df = df.loc[df['date'].notna()]
+            if not df['date'].is_monotonic_increasing:
+                df = df.sort_values('date', kind='stable')
         
         numeric_columns = ['open', 'high', 'low', 'close', 'volume']
         for col in numeric_columns:
-            if col in df.columns:
+            if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
                 df[col] = pd.to_numeric(df[col], errors='coerce')
         
-        if 'date' in df.columns:
-            df = df.dropna(subset=['date'])
-        
         df.insert(0, 'ticker', 'GSIT')
         df.insert(1, 'company', 'GSI Technology Inc.')
         
@@ -49,20 +50,22 @@ def extract_market_data(input_file: str, output_file: str) -> bool:
         
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        df.to_csv(output_file, index=False)
+        OutputWriter.write_csv(df, output_path)
+        OutputWriter.write_parquet(df, output_path.with_suffix('.parquet'))
         
         print(f"  ✓ Saved to: {output_file}")
+        print(f"  ✓ Parquet: {output_path.with_suffix('.parquet')}")
         parser.close()
         
         return True
         
-    except Exception as e:
-        print(f"  ✗ Error processing {input_file}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        log.exception("  ✗ Error processing %s", input_file)
         return False
 
 def main():
+    logging.basicConfig(format='%(message)s')
+    
     project_root = Path(__file__).parent.parent.parent
     input_file = project_root / "data/raw/market data/ChartData_GSIT.xlsx"
     output_file = project_root / "data/processed/market_data/stock_prices.csv"
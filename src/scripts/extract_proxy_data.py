@@ -3,10 +3,16 @@ import pandas as pd
 import sys
 from pathlib import Path
 from datetime import datetime
+import os
+from concurrent.futures import ProcessPoolExecutor
 
 sys.path.append(str(Path(__file__).parent))
 from utils.excel_parser import ExcelParser
 from utils.data_cleaner import DataCleaner
+from utils.output_writer import OutputWriter
+from utils.extraction_cache import ExtractionCache
+
+CACHE_VERSION = 1
 
 def extract_proxy_data(excel_file: Path) -> pd.DataFrame:
     parser = ExcelParser(str(excel_file))
@@ -19,6 +25,12 @@ def extract_proxy_data(excel_file: Path) -> pd.DataFrame:
     
     for sheet_name in sheets:
         try:
+            # The header row takes one row, so fewer than 3 rows can never
+            # yield the 2 data rows required below.
+            dims = parser.get_sheet_dims(sheet_name)
+            if dims and (dims[0] < 3 or dims[1] < 2):
+                continue
+            
             df = parser.read_sheet(sheet_name)
             
             if df.shape[0] < 2 or df.shape[1] < 2:
@@ -29,9 +41,7 @@ def extract_proxy_data(excel_file: Path) -> pd.DataFrame:
             if df.empty:
                 continue
             
-            df.insert(0, 'sheet_name', sheet_name)
-            for key, value in reversed(list(metadata.items())):
-                df.insert(0, key, value)
+            df = DataCleaner.add_metadata_columns(df, {**metadata, 'sheet_name': sheet_name})
             
             all_data.append(df)
             
@@ -48,39 +58,51 @@ def extract_proxy_data(excel_file: Path) -> pd.DataFrame:
     
     return combined_df
 
-def process_all_proxy_statements(input_dir: Path, output_file: Path) -> bool:
-    all_data = []
-    total_files = 0
+def cached_extract_proxy_data(excel_file: Path, cache_dir: Path = None) -> pd.DataFrame:
+    return ExtractionCache.load_or_extract(cache_dir, CACHE_VERSION,
+                                           extract_proxy_data, excel_file)
+
+def process_all_proxy_statements(input_dir: Path, output_file: Path,
+                                 cache_dir: Path = None) -> bool:
     processed_files = 0
     
-    year_dirs = sorted([d for d in input_dir.iterdir() if d.is_dir()],
-                      key=lambda x: x.name)
+    with os.scandir(input_dir) as entries:
+        year_dirs = sorted([e for e in entries if e.is_dir()], key=lambda e: e.name)
     
     print(f"Found {len(year_dirs)} year directories")
     
+    year_files = []
     for year_dir in year_dirs:
-        year = year_dir.name
-        print(f"\nProcessing year: {year}")
-        
-        excel_files = sorted(list(year_dir.glob("*.xlsx")))
-        total_files += len(excel_files)
+        with os.scandir(year_dir.path) as entries:
+            year_files.append((year_dir.name, sorted(Path(e.path) for e in entries
+                                                     if e.name.endswith('.xlsx'))))
+    total_files = sum(len(excel_files) for _, excel_files in year_files)
+    
+    all_data = []
+    
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = {excel_file: executor.submit(cached_extract_proxy_data, excel_file, cache_dir)
+                   for _, excel_files in year_files for excel_file in excel_files}
         
-        for excel_file in excel_files:
-            try:
-                print(f"  Processing: {excel_file.name}")
-                
-                df = extract_proxy_data(excel_file)
-                
-                if not df.empty:
-                    all_data.append(df)
-                    processed_files += 1
-                    print(f"    ✓ Extracted {len(df)} rows")
-                else:
-                    print(f"     No data extracted")
+        for year, excel_files in year_files:
+            print(f"\nProcessing year: {year}")
+            
+            for excel_file in excel_files:
+                try:
+                    print(f"  Processing: {excel_file.name}")
                     
-            except Exception as e:
-                print(f"    ✗ Error: {str(e)}")
-                continue
+                    df = futures[excel_file].result()
+                    
+                    if not df.empty:
+                        all_data.append(df)
+                        processed_files += 1
+                        print(f"    ✓ Extracted {len(df)} rows")
+                    else:
+                        print(f"     No data extracted")
+                        
+                except Exception as e:
+                    print(f"    ✗ Error: {str(e)}")
+                    continue
     
     if not all_data:
         print("\n✗ No data extracted from any files!")
@@ -90,11 +112,14 @@ def process_all_proxy_statements(input_dir: Path, output_file: Path) -> bool:
     combined_df = pd.concat(all_data, ignore_index=True)
     
     output_file.parent.mkdir(parents=True, exist_ok=True)
+    parquet_file = output_file.with_suffix('.parquet')
     combined_df.to_csv(output_file, index=False)
+    OutputWriter.write_parquet(combined_df, parquet_file)
     
     print(f"\n✓ Successfully processed {processed_files}/{total_files} files")
     print(f"✓ Total rows extracted: {len(combined_df)}")
     print(f"✓ Saved to: {output_file}")
+    print(f"✓ Parquet: {parquet_file}")
     
     return True
 
@@ -102,6 +127,7 @@ def main():
     project_root = Path(__file__).parent.parent.parent
     input_dir = project_root / "data/raw/proxies and info statements"
     output_file = project_root / "data/processed/proxy_statements/proxy_data.csv"
+    cache_dir = project_root / "data/.cache/proxy_statements"
     
     print("=" * 80)
     print("GSI Technology - Proxy Statements Extraction")
@@ -112,7 +138,7 @@ def main():
         print(f"Error: Input directory not found: {input_dir}")
         return 1
     
-    success = process_all_proxy_statements(input_dir, output_file)
+    success = process_all_proxy_statements(input_dir, output_file, cache_dir)
     
     print()
     print("=" * 80)
@@ -3,11 +3,36 @@ import pandas as pd
 import sys
 from pathlib import Path
 from datetime import datetime
+import os
+from concurrent.futures import ProcessPoolExecutor
 import re
 
 sys.path.append(str(Path(__file__).parent))
 from utils.excel_parser import ExcelParser
 from utils.data_cleaner import DataCleaner
+from utils.output_writer import OutputWriter
+from utils.extraction_cache import ExtractionCache
+
+CACHE_VERSION = 4
+
+HEADER_KEYWORD_PATTERN = re.compile('march|june|september|december|quarter|'
+                                    '2020|2021|2022|2023|2024|2025')
+COLUMN_NAME_STRIP_PATTERN = re.compile(r'[^\w\s\-/]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+STATEMENT_SPECS = [
+    ('balance_sheet', 'balance_sheets', 'balance sheet'),
+    ('income_statement', 'income_statements', 'income statement'),
+    ('cash_flow', 'cash_flows', 'cash flow'),
+    ('equity', 'equity_statements', 'equity statement'),
+]
+
+OUTPUT_SPECS = [
+    ('balance_sheets', 'balance_sheets.csv', 'Balance sheets'),
+    ('income_statements', 'income_statements.csv', 'Income statements'),
+    ('cash_flows', 'cash_flows.csv', 'Cash flows'),
+    ('equity_statements', 'equity_statements.csv', 'Equity statements'),
+]
 
 def extract_financial_table(df: pd.DataFrame, 
                             table_type: str,
@@ -17,13 +42,9 @@ def extract_financial_table(df: pd.DataFrame,
     if df.empty or df.shape[0] < 2:
         return pd.DataFrame()
     
-    header_row = 0
-    for idx, row in df.iterrows():
-        row_str = ' '.join([str(val).lower() for val in row if pd.notna(val)])
-        if any(kw in row_str for kw in ['march', 'june', 'september', 'december', 
-                                         'quarter', '2020', '2021', '2022', '2023', '2024', '2025']):
-            header_row = idx
-            break
+    cells = df.astype(str).where(df.notna(), '')
+    is_header = cells.apply(lambda col: col.str.lower().str.contains(HEADER_KEYWORD_PATTERN)).any(axis=1)
+    header_row = is_header.idxmax() if is_header.any() else 0
     
     if header_row > 0:
         df.columns = df.iloc[header_row]
@@ -41,23 +62,19 @@ def extract_financial_table(df: pd.DataFrame,
             if pd.isna(col) or col_str in ['', 'nan', 'None']:
                 new_columns.append(f'period_{i}')
             else:
-                clean_name = re.sub(r'[^\w\s\-/]', '', col_str)
-                clean_name = re.sub(r'\s+', '_', clean_name)
+                clean_name = COLUMN_NAME_STRIP_PATTERN.sub('', col_str)
+                clean_name = WHITESPACE_PATTERN.sub('_', clean_name)
                 new_columns.append(clean_name.lower())
     
     df.columns = new_columns
     
-    df = df[df['line_item'].notna()]
-    df = df[df['line_item'].astype(str).str.strip() != '']
+    line_items = df['line_item'].astype('string[pyarrow]').str.strip()
+    df = df.loc[line_items.notna() & (line_items.str.len() > 0)]
     
     numeric_cols = [col for col in df.columns if col != 'line_item']
     df = DataCleaner.clean_financial_values(df, value_columns=numeric_cols)
     
-    df.insert(0, 'statement_type', table_type)
-    for key, value in reversed(list(metadata.items())):
-        df.insert(0, key, value)
-    
-    return df
+    return DataCleaner.add_metadata_columns(df, {**metadata, 'statement_type': table_type})
 
 def extract_quarterly_report(excel_file: Path) -> dict:
     parser = ExcelParser(str(excel_file))
@@ -73,119 +90,79 @@ def extract_quarterly_report(excel_file: Path) -> dict:
         'equity_statements': []
     }
     
-    for sheet_name in categories['balance_sheet']:
-        try:
-            df = parser.read_sheet(sheet_name)
-            df_clean = extract_financial_table(df, 'balance_sheet', metadata)
-            if not df_clean.empty:
-                results['balance_sheets'].append(df_clean)
-        except Exception as e:
-            print(f"    Warning: Error processing balance sheet '{sheet_name}': {e}")
-    
-    for sheet_name in categories['income_statement']:
-        try:
-            df = parser.read_sheet(sheet_name)
-            df_clean = extract_financial_table(df, 'income_statement', metadata)
-            if not df_clean.empty:
-                results['income_statements'].append(df_clean)
-        except Exception as e:
-            print(f"    Warning: Error processing income statement '{sheet_name}': {e}")
-    
-    for sheet_name in categories['cash_flow']:
-        try:
-            df = parser.read_sheet(sheet_name)
-            df_clean = extract_financial_table(df, 'cash_flow', metadata)
-            if not df_clean.empty:
-                results['cash_flows'].append(df_clean)
-        except Exception as e:
-            print(f"    Warning: Error processing cash flow '{sheet_name}': {e}")
-    
-    for sheet_name in categories['equity']:
-        try:
-            df = parser.read_sheet(sheet_name)
-            df_clean = extract_financial_table(df, 'equity', metadata)
-            if not df_clean.empty:
-                results['equity_statements'].append(df_clean)
-        except Exception as e:
-            print(f"    Warning: Error processing equity statement '{sheet_name}': {e}")
+    for table_type, result_key, label in STATEMENT_SPECS:
+        for sheet_name in categories[table_type]:
+            try:
+                df = parser.read_sheet(sheet_name)
+                df_clean = extract_financial_table(df, table_type, metadata)
+                if not df_clean.empty:
+                    results[result_key].append(df_clean)
+            except Exception as e:
+                print(f"    Warning: Error processing {label} '{sheet_name}': {e}")
     
     parser.close()
     return results
 
-def process_all_quarterly_reports(input_dir: Path, output_dir: Path) -> bool:
-    all_balance_sheets = []
-    all_income_statements = []
-    all_cash_flows = []
-    all_equity_statements = []
-    
-    total_files = 0
+def cached_extract_quarterly_report(excel_file: Path, cache_dir: Path = None) -> dict:
+    return ExtractionCache.load_or_extract(cache_dir, CACHE_VERSION,
+                                           extract_quarterly_report, excel_file)
+
+def process_all_quarterly_reports(input_dir: Path, output_dir: Path,
+                                  cache_dir: Path = None) -> bool:
     processed_files = 0
     
-    year_dirs = sorted([d for d in input_dir.iterdir() if d.is_dir()],
-                      key=lambda x: x.name)
+    with os.scandir(input_dir) as entries:
+        year_dirs = sorted([e for e in entries if e.is_dir()], key=lambda e: e.name)
     
     print(f"Found {len(year_dirs)} year directories")
     
+    year_files = []
     for year_dir in year_dirs:
-        year = year_dir.name
-        print(f"\nProcessing year: {year}")
-        
-        excel_files = sorted(list(year_dir.glob("*.xlsx")))
-        total_files += len(excel_files)
+        with os.scandir(year_dir.path) as entries:
+            year_files.append((year_dir.name, sorted(Path(e.path) for e in entries
+                                                     if e.name.endswith('.xlsx'))))
+    total_files = sum(len(excel_files) for _, excel_files in year_files)
+    
+    all_results = {key: [] for key, _, _ in OUTPUT_SPECS}
+    
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = {excel_file: executor.submit(cached_extract_quarterly_report, excel_file, cache_dir)
+                   for _, excel_files in year_files for excel_file in excel_files}
         
-        for excel_file in excel_files:
-            try:
-                print(f"  Processing: {excel_file.name}")
-                
-                results = extract_quarterly_report(excel_file)
-                
-                if results['balance_sheets']:
-                    all_balance_sheets.extend(results['balance_sheets'])
-                if results['income_statements']:
-                    all_income_statements.extend(results['income_statements'])
-                if results['cash_flows']:
-                    all_cash_flows.extend(results['cash_flows'])
-                if results['equity_statements']:
-                    all_equity_statements.extend(results['equity_statements'])
-                
-                processed_files += 1
-                print(f"    ✓ Extracted data")
-                
-            except Exception as e:
-                print(f"    ✗ Error: {str(e)}")
-                continue
+        for year, excel_files in year_files:
+            print(f"\nProcessing year: {year}")
+            
+            for excel_file in excel_files:
+                try:
+                    print(f"  Processing: {excel_file.name}")
+                    
+                    results = futures[excel_file].result()
+                    
+                    for key, _, _ in OUTPUT_SPECS:
+                        all_results[key].extend(results[key])
+                    
+                    processed_files += 1
+                    print(f"    ✓ Extracted data")
+                    
+                except Exception as e:
+                    print(f"    ✗ Error: {str(e)}")
+                    continue
     
     output_dir.mkdir(parents=True, exist_ok=True)
     
     files_created = 0
     
-    if all_balance_sheets:
-        df = pd.concat(all_balance_sheets, ignore_index=True)
-        output_file = output_dir / "balance_sheets.csv"
-        df.to_csv(output_file, index=False)
-        print(f"\n✓ Balance sheets: {len(df)} rows -> {output_file}")
-        files_created += 1
-    
-    if all_income_statements:
-        df = pd.concat(all_income_statements, ignore_index=True)
-        output_file = output_dir / "income_statements.csv"
-        df.to_csv(output_file, index=False)
-        print(f"✓ Income statements: {len(df)} rows -> {output_file}")
-        files_created += 1
-    
-    if all_cash_flows:
-        df = pd.concat(all_cash_flows, ignore_index=True)
-        output_file = output_dir / "cash_flows.csv"
-        df.to_csv(output_file, index=False)
-        print(f"✓ Cash flows: {len(df)} rows -> {output_file}")
-        files_created += 1
-    
-    if all_equity_statements:
-        df = pd.concat(all_equity_statements, ignore_index=True)
-        output_file = output_dir / "equity_statements.csv"
-        df.to_csv(output_file, index=False)
-        print(f"✓ Equity statements: {len(df)} rows -> {output_file}")
-        files_created += 1
+    print()
+    for key, filename, output_label in OUTPUT_SPECS:
+        if all_results[key]:
+            df = pd.concat(all_results[key], ignore_index=True)
+            output_file = output_dir / filename
+            parquet_file = output_file.with_suffix('.parquet')
+            df.to_csv(output_file, index=False)
+            OutputWriter.write_parquet(df, parquet_file)
+            print(f"✓ {output_label}: {len(df)} rows -> {output_file}")
+            print(f"  Parquet: {parquet_file}")
+            files_created += 1
     
     print(f"\n✓ Successfully processed {processed_files}/{total_files} files")
     print(f"✓ Created {files_created} output files")
@@ -196,6 +173,7 @@ def main():
     project_root = Path(__file__).parent.parent.parent
     input_dir = project_root / "data/raw/quarterly reports"
     output_dir = project_root / "data/processed/quarterly_reports"
+    cache_dir = project_root / "data/.cache/quarterly_reports"
     
     print("=" * 80)
     print("GSI Technology - Quarterly Reports (10-Q) Extraction")
@@ -206,7 +184,7 @@ def main():
         print(f"Error: Input directory not found: {input_dir}")
         return 1
     
-    success = process_all_quarterly_reports(input_dir, output_dir)
+    success = process_all_quarterly_reports(input_dir, output_dir, cache_dir)
     
     print()
     print("=" * 80)
@@ -1,34 +1,35 @@
-
 import sys
 from pathlib import Path
 from datetime import datetime
-import subprocess
+import traceback
+from types import ModuleType
+
+import extract_market_data
+import extract_8k_reports
+import extract_quarterly_reports
+import extract_annual_reports
+import extract_proxy_data
 
-def run_script(script_name: str, description: str) -> bool:
+def run_script(script: ModuleType, description: str) -> bool:
     print()
     print("=" * 80)
     print(f"Running: {description}")
     print("=" * 80)
     print()
     
-    script_path = Path(__file__).parent / script_name
-    
+    # Call the script's main() in this interpreter so pandas, pyarrow and the
+    # utils are imported once for the whole run.
     try:
-        result = subprocess.run(
-            [sys.executable, str(script_path)],
-            capture_output=False,
-            text=True
-        )
-        
-        if result.returncode == 0:
-            print(f"\n✓ {description} completed successfully!")
-            return True
-        else:
-            print(f"\n✗ {description} failed with return code {result.returncode}")
-            return False
-            
-    except Exception as e:
-        print(f"\n✗ Error running {script_name}: {str(e)}")
+        exit_code = script.main()
+    except Exception:
+        traceback.print_exc()
+        exit_code = 1
+    
+    if exit_code == 0:
+        print(f"\n✓ {description} completed successfully!")
+        return True
+    else:
+        print(f"\n✗ {description} failed with return code {exit_code}")
         return False
 
 def main():
@@ -39,17 +40,17 @@ def main():
     print("=" * 80)
     
     scripts = [
-        ("extract_market_data.py", "Market Data (Stock Prices)"),
-        ("extract_8k_reports.py", "8-K Reports (Current Reports)"),
-        ("extract_quarterly_reports.py", "Quarterly Reports (10-Q)"),
-        ("extract_annual_reports.py", "Annual Reports (10-K)"),
-        ("extract_proxy_data.py", "Proxy Statements (DEF 14A)"),
+        (extract_market_data, "Market Data (Stock Prices)"),
+        (extract_8k_reports, "8-K Reports (Current Reports)"),
+        (extract_quarterly_reports, "Quarterly Reports (10-Q)"),
+        (extract_annual_reports, "Annual Reports (10-K)"),
+        (extract_proxy_data, "Proxy Statements (DEF 14A)"),
     ]
     
     results = {}
     
-    for script_name, description in scripts:
-        success = run_script(script_name, description)
+    for script, description in scripts:
+        success = run_script(script, description)
         results[description] = success
     
     print()
@@ -4,6 +4,8 @@ Utility modules for GSI Technology financial data extraction.
 
 from .excel_parser import ExcelParser
 from .data_cleaner import DataCleaner
+from .output_writer import OutputWriter
+from .extraction_cache import ExtractionCache
 
-__all__ = ['ExcelParser', 'DataCleaner']
+__all__ = ['ExcelParser', 'DataCleaner', 'OutputWriter', 'ExtractionCache']
 
@@ -3,8 +3,52 @@ import pandas as pd
 import numpy as np
 from typing import List, Dict, Optional
 import re
+import functools
 from datetime import datetime
 
+NULL_VALUE_TOKENS = ['-', '—', 'N/A', 'n/a', 'NA']
+CURRENCY_PATTERN = re.compile(r'[\$€£¥,\s]')
+
+ITEM_NAME_MAPPINGS = {
+    r'.*cash.*cash equivalents.*': 'Cash and cash equivalents',
+    r'.*short.*term.*investments?.*': 'Short-term investments',
+    r'.*accounts? receivable.*': 'Accounts receivable',
+    r'.*inventories.*': 'Inventories',
+    r'.*total current assets.*': 'Total current assets',
+    r'.*property.*equipment.*': 'Property and equipment',
+    r'.*total assets.*': 'Total assets',
+    r'.*accounts? payable.*': 'Accounts payable',
+    r'.*accrued.*expenses.*': 'Accrued expenses',
+    r'.*total current liabilities.*': 'Total current liabilities',
+    r'.*total liabilities.*': 'Total liabilities',
+    r'.*stockholders?.* equity.*': 'Stockholders equity',
+    r'.*shareholders?.* equity.*': 'Stockholders equity',
+    r'.*net revenues?.*': 'Net revenues',
+    r'.*cost of (?:goods|revenue).*sold.*': 'Cost of revenues',
+    r'.*gross profit.*': 'Gross profit',
+    r'.*research.*development.*': 'Research and development',
+    r'.*selling.*general.*administrative.*': 'Selling, general and administrative',
+    r'.*operating (?:income|profit).*': 'Operating income',
+    r'.*operating loss.*': 'Operating loss',
+    r'.*net income.*': 'Net income',
+    r'.*net loss.*': 'Net loss',
+    r'.*(?:basic|diluted) (?:earnings|loss) per share.*': 'Earnings per share',
+}
+
+# One anchored alternation tried in mapping order; the named group that
+# matched tells which canonical name applies.
+ITEM_NAME_PATTERN = re.compile('^(?:' + '|'.join(f'(?P<item{i}>{pattern})'
+                                                 for i, pattern in enumerate(ITEM_NAME_MAPPINGS)) + ')')
+ITEM_NAME_BY_GROUP = {f'item{i}': name for i, name in enumerate(ITEM_NAME_MAPPINGS.values())}
+NUMBER_STRIP_PATTERN = re.compile(r'[\$,\s\(\)]')
+
+SUBTOTAL_KEYWORDS = ('subtotal', 'sub-total', 'continued')
+
+# Keywords are regex alternatives, as remove_subtotal_rows has always treated them.
+@functools.lru_cache(maxsize=8)
+def _keyword_pattern(keywords: tuple) -> re.Pattern:
+    return re.compile('|'.join(keywords))
+
 class DataCleaner:
     
     @staticmethod
@@ -22,7 +66,9 @@ class DataCleaner:
     def clean_financial_values(df: pd.DataFrame, 
                                value_columns: List[str] = None,
                                thousands_units: bool = True) -> pd.DataFrame:
-        df_copy = df.copy()
+        # Cleaned columns are assigned wholesale, so a shallow copy is enough
+        # to leave the caller's frame untouched.
+        df_copy = df.copy(deep=False)
         
         if value_columns is None:
             value_columns = []
@@ -36,21 +82,42 @@ class DataCleaner:
             if col not in df_copy.columns:
                 continue
             
-            df_copy[col] = df_copy[col].apply(DataCleaner._clean_numeric_value)
-            
-            df_copy[col] = pd.to_numeric(df_copy[col], errors='coerce')
+            df_copy[col] = DataCleaner._clean_numeric_series(df_copy[col])
         
         return df_copy
     
     @staticmethod
     def _looks_like_number(value: str) -> bool:
-        cleaned = re.sub(r'[\$,\s\(\)]', '', str(value))
+        cleaned = NUMBER_STRIP_PATTERN.sub('', str(value))
         try:
             float(cleaned)
             return True
         except ValueError:
             return False
     
+    @staticmethod
+    def _clean_numeric_series(series: pd.Series) -> pd.Series:
+        if series.empty:
+            return pd.to_numeric(series, errors='coerce')
+        
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            return series.astype('float64')
+        
+        # Statement columns repeat a few tokens ('-', blanks, the same figures
+        # across periods), so parse each distinct value once and map it back.
+        # Values are keyed on str(), as the scalar parser sees them; raw objects
+        # would merge 1 with True and 0.0 with -0.0.
+        values = series.to_numpy(dtype=object)
+        present = pd.notna(values)
+        keys = np.fromiter(map(str, values[present]), dtype=object, count=int(present.sum()))
+        codes, tokens = pd.factorize(keys)
+        parsed = np.array([DataCleaner._clean_numeric_value(token) for token in tokens],
+                          dtype='float64')
+        
+        numbers = np.full(len(values), np.nan)
+        numbers[present] = parsed[codes]
+        return pd.Series(numbers, index=series.index, name=series.name)
+    
     @staticmethod
     def _clean_numeric_value(value):
         if pd.isna(value):
@@ -58,7 +125,7 @@ class DataCleaner:
         
         value_str = str(value).strip()
         
-        if not value_str or value_str in ['-', '—', 'N/A', 'n/a', 'NA']:
+        if not value_str or value_str in NULL_VALUE_TOKENS:
             return None
         
         is_negative = False
@@ -66,7 +133,7 @@ class DataCleaner:
             is_negative = True
             value_str = value_str[1:-1]
         
-        value_str = re.sub(r'[\$€£¥,\s]', '', value_str)
+        value_str = CURRENCY_PATTERN.sub('', value_str)
         
         if '%' in value_str:
             value_str = value_str.replace('%', '')
@@ -85,7 +152,7 @@ class DataCleaner:
     def standardize_date_column(df: pd.DataFrame, 
                                 date_column: str,
                                 date_format: str = None) -> pd.DataFrame:
-        df_copy = df.copy()
+        df_copy = df.copy(deep=False)
         
         if date_column not in df_copy.columns:
             return df_copy
@@ -106,16 +173,15 @@ class DataCleaner:
     @staticmethod
     def add_metadata_columns(df: pd.DataFrame, 
                             metadata: Dict[str, str]) -> pd.DataFrame:
-        df_copy = df.copy()
-        
-        for key, value in reversed(list(metadata.items())):
-            df_copy.insert(0, key, value)
+        existing = [key for key in metadata if key in df.columns]
+        if existing:
+            raise ValueError(f"cannot insert {existing[0]}, already exists")
         
-        return df_copy
+        return pd.concat([pd.DataFrame(metadata, index=df.index), df], axis=1)
     
     @staticmethod
     def deduplicate_column_names(df: pd.DataFrame) -> pd.DataFrame:
-        df_copy = df.copy()
+        df_copy = df.copy(deep=False)
         
         col_counts = {}
         new_columns = []
@@ -134,7 +200,7 @@ class DataCleaner:
     @staticmethod
     def normalize_item_names(df: pd.DataFrame, 
                             item_column: str = None) -> pd.DataFrame:
-        df_copy = df.copy()
+        df_copy = df.copy(deep=False)
         
         if item_column is None:
             item_column = df_copy.columns[0]
@@ -142,45 +208,17 @@ class DataCleaner:
         if item_column not in df_copy.columns:
             return df_copy
         
-        mappings = {
-            r'.*cash.*cash equivalents.*': 'Cash and cash equivalents',
-            r'.*short.*term.*investments?.*': 'Short-term investments',
-            r'.*accounts? receivable.*': 'Accounts receivable',
-            r'.*inventories.*': 'Inventories',
-            r'.*total current assets.*': 'Total current assets',
-            r'.*property.*equipment.*': 'Property and equipment',
-            r'.*total assets.*': 'Total assets',
-            r'.*accounts? payable.*': 'Accounts payable',
-            r'.*accrued.*expenses.*': 'Accrued expenses',
-            r'.*total current liabilities.*': 'Total current liabilities',
-            r'.*total liabilities.*': 'Total liabilities',
-            r'.*stockholders?.* equity.*': 'Stockholders equity',
-            r'.*shareholders?.* equity.*': 'Stockholders equity',
-            r'.*net revenues?.*': 'Net revenues',
-            r'.*cost of (?:goods|revenue).*sold.*': 'Cost of revenues',
-            r'.*gross profit.*': 'Gross profit',
-            r'.*research.*development.*': 'Research and development',
-            r'.*selling.*general.*administrative.*': 'Selling, general and administrative',
-            r'.*operating (?:income|profit).*': 'Operating income',
-            r'.*operating loss.*': 'Operating loss',
-            r'.*net income.*': 'Net income',
-            r'.*net loss.*': 'Net loss',
-            r'.*(?:basic|diluted) (?:earnings|loss) per share.*': 'Earnings per share',
-        }
+        names = df_copy[item_column]
         
-        def normalize_name(name):
-            if pd.isna(name):
-                return name
-            
-            name_lower = str(name).lower().strip()
-            
-            for pattern, standard_name in mappings.items():
-                if re.match(pattern, name_lower):
-                    return standard_name
-            
-            return name
+        # Line items repeat heavily, so match each distinct name only once.
+        codes, unique_names = pd.factorize(names.astype(str).str.lower().str.strip())
+        hits = pd.Series(unique_names, dtype=object).str.extract(ITEM_NAME_PATTERN).notna()
+        unique_canonical = hits.idxmax(axis=1).map(ITEM_NAME_BY_GROUP).where(hits.any(axis=1))
         
-        df_copy[item_column] = df_copy[item_column].apply(normalize_name)
+        canonical = pd.Series(unique_canonical.to_numpy()[codes], index=names.index)
+        matched = canonical.notna() & names.notna()
+        if matched.any():
+            df_copy[item_column] = names.where(~matched, canonical)
         
         return df_copy
     
@@ -236,9 +274,9 @@ class DataCleaner:
                             item_column: str = None,
                             keywords: List[str] = None) -> pd.DataFrame:
         if keywords is None:
-            keywords = ['subtotal', 'sub-total', 'continued']
+            keywords = SUBTOTAL_KEYWORDS
         
-        df_copy = df.copy()
+        df_copy = df.copy(deep=False)
         
         if item_column is None:
             item_column = df_copy.columns[0]
@@ -247,9 +285,8 @@ class DataCleaner:
             return df_copy
         
         mask = ~df_copy[item_column].astype(str).str.lower().str.contains(
-            '|'.join(keywords), 
-            na=False, 
-            regex=True
+            _keyword_pattern(tuple(keywords)), 
+            na=False
         )
         
         return df_copy[mask]
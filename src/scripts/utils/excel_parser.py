@@ -4,20 +4,139 @@ import numpy as np
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 import re
+import functools
 from datetime import datetime
+import importlib.util
+
+EXCEL_ENGINE = 'calamine' if importlib.util.find_spec('python_calamine') is not None else None
+
+SHEET_CATEGORY_KEYWORDS = {
+    'balance_sheet': ['balance sheet', 'balance', 'assets', 'liabilities'],
+    'income_statement': ['income statement', 'income', 'operations', 'profit', 'loss'],
+    'cash_flow': ['cash flow', 'cash'],
+    'comprehensive_income': ['comprehensive'],
+    'equity': ['equity', 'stockholders', 'shareholders'],
+    'compensation': ['compensation', 'executive'],
+    'notes': ['note', 'accounting pronouncements', 'fair value', 'investment']
+}
+
+SHEET_CATEGORY_PATTERNS = [
+    (category, re.compile('|'.join(map(re.escape, kws))))
+    for category, kws in SHEET_CATEGORY_KEYWORDS.items()
+]
+
+@functools.lru_cache(maxsize=2048)
+def _categorize_sheet_name(sheet_name: str) -> str:
+    sheet_lower = sheet_name.lower()
+    for category, pattern in SHEET_CATEGORY_PATTERNS:
+        if pattern.search(sheet_lower):
+            return category
+    return 'other'
+
+COMPANY_PATTERN = re.compile(r'^([^(]+)')
+FORM_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in [r'(8-K)', r'(10-K)', r'(10-Q)', r'(DEF\s*14A)',
+                    r'(S-\d+)', r'(ARS)', r'Form\s+(\w+-?\w*)']
+]
+FILING_DATE_PATTERN = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+
+FINANCIAL_COLUMN_MAPPINGS = {
+    r'.*date.*': 'date',
+    r'.*period.*ended.*': 'period_ended',
+    r'.*fiscal.*year.*': 'fiscal_year',
+    
+    r'.*total.*assets.*': 'total_assets',
+    r'.*total.*liabilities.*': 'total_liabilities',
+    r'.*stockholders.*equity.*': 'stockholders_equity',
+    r'.*cash.*equivalents.*': 'cash_and_equivalents',
+    r'.*accounts.*receivable.*': 'accounts_receivable',
+    r'.*inventories.*': 'inventories',
+    
+    r'.*net.*revenues?.*': 'net_revenues',
+    r'.*total.*revenues?.*': 'total_revenues',
+    r'.*cost.*goods.*sold.*': 'cost_of_goods_sold',
+    r'.*gross.*profit.*': 'gross_profit',
+    r'.*operating.*income.*': 'operating_income',
+    r'.*net.*income.*': 'net_income',
+    r'.*net.*loss.*': 'net_loss',
+    
+    r'.*operating.*activities.*': 'cash_from_operations',
+    r'.*investing.*activities.*': 'cash_from_investing',
+    r'.*financing.*activities.*': 'cash_from_financing',
+}
+
+FINANCIAL_COLUMN_PATTERN = re.compile('^(?:' + '|'.join(f'(?P<column{i}>{pattern})'
+                                                        for i, pattern in enumerate(FINANCIAL_COLUMN_MAPPINGS)) + ')')
+FINANCIAL_COLUMN_BY_GROUP = {f'column{i}': name
+                             for i, name in enumerate(FINANCIAL_COLUMN_MAPPINGS.values())}
+COLUMN_NAME_STRIP_PATTERN = re.compile(r'[^\w\s\(\)]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+@functools.lru_cache(maxsize=4096)
+def _standard_column_name(col_lower: str) -> Optional[str]:
+    match = FINANCIAL_COLUMN_PATTERN.match(col_lower)
+    return FINANCIAL_COLUMN_BY_GROUP[match.lastgroup] if match else None
+
+@functools.lru_cache(maxsize=4096)
+def _metadata_from_filename(filename: str) -> Dict[str, str]:
+    metadata = {
+        'filename': filename,
+        'company': None,
+        'form_type': None,
+        'filing_date': None,
+        'year': None
+    }
+    
+    company_match = COMPANY_PATTERN.search(filename)
+    if company_match:
+        metadata['company'] = company_match.group(1).strip()
+    
+    for pattern in FORM_PATTERNS:
+        form_match = pattern.search(filename)
+        if form_match:
+            metadata['form_type'] = form_match.group(1).upper()
+            break
+    
+    date_match = FILING_DATE_PATTERN.search(filename)
+    if date_match:
+        metadata['filing_date'] = f"{date_match.group(1)}-{date_match.group(2)}-{date_match.group(3)}"
+        metadata['year'] = date_match.group(1)
+    
+    return metadata
 
 class ExcelParser:
     
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, engine: Optional[str] = EXCEL_ENGINE):
         self.file_path = Path(file_path)
-        self.excel_file = pd.ExcelFile(file_path)
-        self.sheet_names = self.excel_file.sheet_names
-        
+        self.engine = engine
+    
+    # The workbook is opened on first use, so callers that only need the
+    # filename metadata never pay for parsing it.
+    @functools.cached_property
+    def excel_file(self) -> pd.ExcelFile:
+        return pd.ExcelFile(self.file_path, engine=self.engine)
+    
+    @property
+    def sheet_names(self) -> List[str]:
+        return self.excel_file.sheet_names
+    
     def get_sheet_names(self) -> List[str]:
         return self.sheet_names
     
     def read_sheet(self, sheet_name: str, **kwargs) -> pd.DataFrame:
-        return pd.read_excel(self.excel_file, sheet_name=sheet_name, **kwargs)
+        return self.excel_file.parse(sheet_name=sheet_name, **kwargs)
+    
+    def get_sheet_dims(self, sheet_name: str) -> Optional[Tuple[int, int]]:
+        if self.excel_file.engine == 'calamine':
+            sheet = self.excel_file.book.get_sheet_by_name(sheet_name)
+            if sheet.end is None:
+                return 0, 0
+            return sheet.end[0] + 1, sheet.end[1] + 1
+        
+        # openpyxl's read-only dimensions come from the stored <dimension>
+        # record, which can be stale, so only calamine's computed extent is trusted.
+        return None
     
     def find_header_row(self, df: pd.DataFrame, keywords: List[str] = None) -> int:
         if keywords is None:
@@ -31,113 +150,87 @@ class ExcelParser:
     
     def clean_dataframe(self, df: pd.DataFrame, header_row: int = 0) -> pd.DataFrame:
         if header_row > 0:
-            df.columns = df.iloc[header_row]
-            df = df.iloc[header_row + 1:].reset_index(drop=True)
-        
-        df = df.dropna(how='all')
+            header = pd.Index(df.iloc[header_row])
+            body = df.iloc[header_row + 1:]
+        else:
+            header = df.columns
+            body = df
         
-        df = df.dropna(axis=1, how='all')
+        # Decide which rows, columns and names survive first, then slice once.
+        present = body.notna().to_numpy()
+        keep_rows = present.any(axis=1)
+        keep_cols = np.flatnonzero(present.any(axis=0))
         
-        df.columns = [self._clean_column_name(col) for col in df.columns]
+        names = self._clean_column_names(header[keep_cols])
+        unique = ~names.duplicated()
         
-        df = df.loc[:, ~df.columns.duplicated()]
+        df = body.iloc[keep_rows, keep_cols[unique]]
+        if header_row > 0:
+            df.index = np.flatnonzero(keep_rows)
+        df.columns = names[unique]
         
         return df
     
-    def _clean_column_name(self, col_name) -> str:
-        if pd.isna(col_name):
-            return 'unnamed'
+    def _clean_column_names(self, columns) -> pd.Index:
+        columns = pd.Index(columns)
         
-        col_name = str(col_name).lower().strip()
+        names = pd.Index([str(col) for col in columns], dtype=object).str.lower().str.strip()
         
-        col_name = re.sub(r'[^\w\s\(\)]', '', col_name)
+        names = names.str.replace(COLUMN_NAME_STRIP_PATTERN, '', regex=True)
         
-        col_name = re.sub(r'\s+', '_', col_name)
+        names = names.str.replace(WHITESPACE_PATTERN, '_', regex=True)
         
-        return col_name
+        return names.where(~columns.isna(), 'unnamed')
     
     def detect_table_boundaries(self, df: pd.DataFrame) -> Tuple[int, int]:
+        counts = df.notna().to_numpy().sum(axis=1)
+        
         start_row = 0
-        for idx, row in df.iterrows():
-            non_null_ratio = row.notna().sum() / len(row)
-            if non_null_ratio > 0.3:  # At least 30% non-null
-                start_row = idx
-                break
+        if df.shape[1]:
+            start_hits = np.flatnonzero(counts / df.shape[1] > 0.3)  # At least 30% non-null
+            if start_hits.size:
+                start_row = df.index[start_hits[0]]
         
         end_row = len(df)
-        for idx in range(len(df) - 1, -1, -1):
-            row = df.iloc[idx]
-            if row.notna().sum() > 1:  # At least 2 non-null values
-                end_row = idx + 1
-                break
+        end_hits = np.flatnonzero(counts > 1)  # At least 2 non-null values
+        if end_hits.size:
+            end_row = int(end_hits[-1]) + 1
         
         return start_row, end_row
     
     def extract_metadata_from_filename(self) -> Dict[str, str]:
-        filename = self.file_path.stem
-        metadata = {
-            'filename': filename,
-            'company': None,
-            'form_type': None,
-            'filing_date': None,
-            'year': None
-        }
-        
-        company_match = re.search(r'^([^(]+)', filename)
-        if company_match:
-            metadata['company'] = company_match.group(1).strip()
-        
-        form_patterns = [
-            r'(8-K)', r'(10-K)', r'(10-Q)', r'(DEF\s*14A)',
-            r'(S-\d+)', r'(ARS)', r'Form\s+(\w+-?\w*)'
-        ]
-        for pattern in form_patterns:
-            form_match = re.search(pattern, filename, re.IGNORECASE)
-            if form_match:
-                metadata['form_type'] = form_match.group(1).upper()
-                break
-        
-        date_match = re.search(r'(\d{4})-(\d{2})-(\d{2})', filename)
-        if date_match:
-            metadata['filing_date'] = f"{date_match.group(1)}-{date_match.group(2)}-{date_match.group(3)}"
-            metadata['year'] = date_match.group(1)
-        
-        return metadata
+        return dict(_metadata_from_filename(self.file_path.stem))
+    
+    @staticmethod
+    def extract_metadata_batch(file_paths: List[str]) -> pd.DataFrame:
+        filenames = pd.Series([Path(path).stem for path in file_paths], dtype=object)
+        
+        company = filenames.str.extract(COMPANY_PATTERN, expand=False).str.strip()
+        
+        # Patterns are tried in order, as in extract_metadata_from_filename.
+        form_type = pd.Series(np.nan, index=filenames.index, dtype=object)
+        for pattern in FORM_PATTERNS:
+            matches = filenames.str.extract(pattern, expand=False).str.upper()
+            form_type = form_type.where(form_type.notna(), matches)
+        
+        date_parts = filenames.str.extract(FILING_DATE_PATTERN)
+        filing_date = date_parts[0] + '-' + date_parts[1] + '-' + date_parts[2]
+        
+        metadata = pd.DataFrame({
+            'filename': filenames,
+            'company': company,
+            'form_type': form_type,
+            'filing_date': filing_date,
+            'year': date_parts[0]
+        }).astype(object)
+        return metadata.where(metadata.notna(), None)
     
     def find_financial_statement_sheets(self) -> Dict[str, List[str]]:
-        categories = {
-            'balance_sheet': [],
-            'income_statement': [],
-            'cash_flow': [],
-            'comprehensive_income': [],
-            'equity': [],
-            'compensation': [],
-            'notes': [],
-            'other': []
-        }
-        
-        keywords = {
-            'balance_sheet': ['balance sheet', 'balance', 'assets', 'liabilities'],
-            'income_statement': ['income statement', 'income', 'operations', 'profit', 'loss'],
-            'cash_flow': ['cash flow', 'cash'],
-            'comprehensive_income': ['comprehensive'],
-            'equity': ['equity', 'stockholders', 'shareholders'],
-            'compensation': ['compensation', 'executive'],
-            'notes': ['note', 'accounting pronouncements', 'fair value', 'investment']
-        }
+        categories = {category: [] for category in SHEET_CATEGORY_KEYWORDS}
+        categories['other'] = []
         
         for sheet in self.sheet_names:
-            sheet_lower = sheet.lower()
-            categorized = False
-            
-            for category, kws in keywords.items():
-                if any(kw in sheet_lower for kw in kws):
-                    categories[category].append(sheet)
-                    categorized = True
-                    break
-            
-            if not categorized:
-                categories['other'].append(sheet)
+            categories[_categorize_sheet_name(sheet)].append(sheet)
         
         return categories
     
@@ -145,81 +238,55 @@ class ExcelParser:
         if num_header_rows < 2:
             return df
         
-        header_rows = []
-        for i in range(num_header_rows):
-            header_rows.append(df.iloc[i].fillna(''))
+        header = pd.DataFrame(df.iloc[:num_header_rows].to_numpy(dtype=object)).fillna('')
+        parts = header.apply(lambda col: col.map(str).str.strip())
         
-        merged_headers = []
-        for col_idx in range(len(df.columns)):
-            parts = [str(header_rows[i].iloc[col_idx]).strip() 
-                    for i in range(num_header_rows) 
-                    if str(header_rows[i].iloc[col_idx]).strip()]
-            merged_header = ' '.join(parts)
-            merged_headers.append(self._clean_column_name(merged_header))
+        merged = parts.iloc[0]
+        for i in range(1, num_header_rows):
+            part = parts.iloc[i]
+            merged = merged.where(part == '', (merged + ' ' + part).where(merged != '', part))
         
-        df_new = df.iloc[num_header_rows:].copy()
-        df_new.columns = merged_headers
-        df_new = df_new.reset_index(drop=True)
+        df_new = df.iloc[num_header_rows:].reset_index(drop=True)
+        df_new.columns = self._clean_column_names(merged)
         
         return df_new
     
     def standardize_financial_columns(self, df: pd.DataFrame) -> pd.DataFrame:
-        column_mappings = {
-            r'.*date.*': 'date',
-            r'.*period.*ended.*': 'period_ended',
-            r'.*fiscal.*year.*': 'fiscal_year',
-            
-            r'.*total.*assets.*': 'total_assets',
-            r'.*total.*liabilities.*': 'total_liabilities',
-            r'.*stockholders.*equity.*': 'stockholders_equity',
-            r'.*cash.*equivalents.*': 'cash_and_equivalents',
-            r'.*accounts.*receivable.*': 'accounts_receivable',
-            r'.*inventories.*': 'inventories',
-            
-            r'.*net.*revenues?.*': 'net_revenues',
-            r'.*total.*revenues?.*': 'total_revenues',
-            r'.*cost.*goods.*sold.*': 'cost_of_goods_sold',
-            r'.*gross.*profit.*': 'gross_profit',
-            r'.*operating.*income.*': 'operating_income',
-            r'.*net.*income.*': 'net_income',
-            r'.*net.*loss.*': 'net_loss',
-            
-            r'.*operating.*activities.*': 'cash_from_operations',
-            r'.*investing.*activities.*': 'cash_from_investing',
-            r'.*financing.*activities.*': 'cash_from_financing',
-        }
-        
         new_columns = []
         for col in df.columns:
-            col_lower = str(col).lower()
-            matched = False
-            
-            for pattern, standard_name in column_mappings.items():
-                if re.match(pattern, col_lower):
-                    new_columns.append(standard_name)
-                    matched = True
-                    break
-            
-            if not matched:
-                new_columns.append(col)
+            standard_name = _standard_column_name(str(col).lower())
+            new_columns.append(standard_name if standard_name else col)
         
         df.columns = new_columns
         return df
     
-    def extract_numeric_values(self, df: pd.DataFrame, exclude_cols: List[str] = None) -> pd.DataFrame:
+    def extract_numeric_values(self, df: pd.DataFrame, exclude_cols: List[str] = None,
+                               copy: bool = True) -> pd.DataFrame:
         if exclude_cols is None:
             exclude_cols = []
         
-        df_copy = df.copy()
+        # With copy=False the converted columns are written back into df itself.
+        df_copy = df.copy(deep=False) if copy else df
         
         for col in df_copy.columns:
-            if col in exclude_cols:
+            if col in exclude_cols or pd.api.types.is_numeric_dtype(df_copy[col]):
                 continue
             
-            df_copy[col] = pd.to_numeric(df_copy[col], errors='ignore')
+            # Columns that do not fully parse are kept as they are.
+            try:
+                df_copy[col] = pd.to_numeric(df_copy[col])
+            except (ValueError, TypeError):
+                pass
         
         return df_copy
     
     def close(self):
-        self.excel_file.close()
+        if 'excel_file' in self.__dict__:
+            self.excel_file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
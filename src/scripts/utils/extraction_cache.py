@@ -0,0 +1,64 @@
+import functools
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable
+
+# Shared helpers whose behaviour is baked into every cached result.
+UTILS_SOURCES = ('data_cleaner.py', 'excel_parser.py')
+
+@functools.lru_cache(maxsize=8)
+def _source_digest(module_file: str) -> str:
+    utils_dir = Path(__file__).parent
+    digest = hashlib.sha1()
+    for source in [Path(module_file), *(utils_dir / name for name in UTILS_SOURCES)]:
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+class ExtractionCache:
+    
+    @staticmethod
+    def cache_file(cache_dir: Path, version: int, excel_file: Path, *key_parts) -> Path:
+        stat = excel_file.stat()
+        key = '|'.join(str(part) for part in (version, excel_file.resolve(),
+                                               stat.st_mtime_ns, stat.st_size, *key_parts))
+        return cache_dir / f"{hashlib.sha1(key.encode()).hexdigest()}.pkl"
+    
+    @staticmethod
+    def load_or_extract(cache_dir: Path, version: int,
+                        extract: Callable[..., Any], excel_file: Path, *args) -> Any:
+        if cache_dir is None:
+            return extract(excel_file, *args)
+        
+        # Editing the extracting script or the shared utils changes the key,
+        # so results are never reused across code changes.
+        sources = _source_digest(sys.modules[extract.__module__].__file__)
+        cache_file = ExtractionCache.cache_file(cache_dir, version, excel_file, sources, *args)
+        
+        # An unreadable entry (truncated, or pickled by another pandas) is a miss.
+        try:
+            with open(cache_file, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception:
+            cache_file.unlink(missing_ok=True)
+        
+        results = extract(excel_file, *args)
+        
+        # Write next to the final path and rename into place, so an interrupted
+        # run never leaves a partial entry behind.
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(results, f)
+            os.replace(tmp_name, cache_file)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        
+        return results
@@ -0,0 +1,48 @@
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pyarrow.csv as pacsv
+from pathlib import Path
+from typing import List
+
+class OutputWriter:
+    
+    @staticmethod
+    def to_arrow_table(df: pd.DataFrame) -> pa.Table:
+        df = df.copy(deep=False)
+        df.columns = [str(col) for col in df.columns]
+        
+        for col in df.select_dtypes(include=['object', 'category']).columns:
+            df[col] = df[col].astype('string')
+        
+        return pa.Table.from_pandas(df, preserve_index=False)
+    
+    @staticmethod
+    def write_csv(df: pd.DataFrame, output_file: Path) -> None:
+        df = df.copy(deep=False)
+        
+        # Keep plain YYYY-MM-DD dates the way DataFrame.to_csv writes them.
+        for col in df.select_dtypes(include=['datetime']).columns:
+            values = df[col].dropna()
+            if (values.dt.normalize() == values).all():
+                df[col] = df[col].dt.date
+        
+        pacsv.write_csv(OutputWriter.to_arrow_table(df), str(output_file))
+    
+    @staticmethod
+    def write_parquet(df: pd.DataFrame, output_file: Path) -> None:
+        pq.write_table(OutputWriter.to_arrow_table(df), str(output_file), compression='zstd')
+    
+    @staticmethod
+    def write_parquet_dataset(df: pd.DataFrame,
+                              output_path: Path,
+                              partition_cols: List[str]) -> None:
+        table = OutputWriter.to_arrow_table(df)
+        partitioning = ds.partitioning(table.select(partition_cols).schema, flavor='hive')
+        
+        ds.write_dataset(table, str(output_path), format='parquet',
+                         partitioning=partitioning,
+                         existing_data_behavior='delete_matching')
+
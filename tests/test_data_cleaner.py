@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src' / 'scripts'))
+
+from utils.data_cleaner import DataCleaner
+
+
+def test_clean_financial_values_parses_formats():
+    df = pd.DataFrame({'Value': ['$1,000', '(250)', '5%', '-', None, 'abc']})
+
+    result = DataCleaner.clean_financial_values(df, ['Value'])
+
+    expected = pd.Series([1000.0, -250.0, 0.05, np.nan, np.nan, np.nan], name='Value')
+    pd.testing.assert_series_equal(result['Value'], expected)
+
+
+def test_clean_financial_values_keeps_duplicate_index_positions():
+    df = pd.DataFrame({'Value': ['$1,000', None, '5%', '-']}, index=[0, 0, 1, 1])
+
+    result = DataCleaner.clean_financial_values(df, ['Value'])
+
+    expected = pd.Series([1000.0, np.nan, 0.05, np.nan], index=[0, 0, 1, 1], name='Value')
+    pd.testing.assert_series_equal(result['Value'], expected)
+
+
+def test_deduplicate_column_names_suffixes_repeats():
+    df = pd.DataFrame([[1, 2, 3, 4]], columns=['a', 'b', 'a', 'a'])
+
+    result = DataCleaner.deduplicate_column_names(df)
+
+    assert list(result.columns) == ['a', 'b', 'a_1', 'a_2']
+    assert list(df.columns) == ['a', 'b', 'a', 'a']
+
+
+def test_deduplicate_column_names_formats_non_string_labels():
+    dates = pd.to_datetime(['2020-01-01', '2020-01-01', '2021-01-01'])
+    df = pd.DataFrame([[1, 2, 3]], columns=dates)
+
+    result = DataCleaner.deduplicate_column_names(df)
+
+    assert list(result.columns) == [pd.Timestamp('2020-01-01'), '2020-01-01 00:00:00_1',
+                                    pd.Timestamp('2021-01-01')]
@@ -0,0 +1,60 @@
+import pickle
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+RAW_DIR = ROOT / 'data' / 'raw'
+
+sys.path.insert(0, str(ROOT / 'src' / 'scripts'))
+
+import extract_proxy_data
+import extract_quarterly_reports
+from utils import extraction_cache
+
+QUARTERLY_FILE = sorted((RAW_DIR / 'quarterly reports').rglob('*.xlsx'))[0]
+PROXY_FILE = sorted((RAW_DIR / 'proxies and info statements').rglob('*.xlsx'))[0]
+
+
+def test_truncated_entry_is_re_extracted(tmp_path):
+    expected = extract_quarterly_reports.cached_extract_quarterly_report(QUARTERLY_FILE, tmp_path)
+    [cache_file] = tmp_path.iterdir()
+    data = cache_file.read_bytes()
+    cache_file.write_bytes(data[:len(data) // 2])
+
+    results = extract_quarterly_reports.cached_extract_quarterly_report(QUARTERLY_FILE, tmp_path)
+
+    for key, frames in expected.items():
+        assert len(results[key]) == len(frames)
+        for df, expected_df in zip(results[key], frames):
+            assert df.equals(expected_df)
+    assert list(tmp_path.iterdir()) == [cache_file]
+    assert cache_file.read_bytes() == data
+
+
+def test_interrupted_write_leaves_no_entry(tmp_path, monkeypatch):
+    def interrupted_dump(obj, f):
+        f.write(b'partial')
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(extraction_cache.pickle, 'dump', interrupted_dump)
+
+    with pytest.raises(KeyboardInterrupt):
+        extract_proxy_data.cached_extract_proxy_data(PROXY_FILE, tmp_path)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_source_change_invalidates_entry(tmp_path, monkeypatch):
+    extract_proxy_data.cached_extract_proxy_data(PROXY_FILE, tmp_path)
+    [old_entry] = tmp_path.iterdir()
+
+    monkeypatch.setattr(extraction_cache, '_source_digest', lambda module_file: 'edited')
+    df = extract_proxy_data.cached_extract_proxy_data(PROXY_FILE, tmp_path)
+
+    assert not df.empty
+    assert len(list(tmp_path.glob('*.pkl'))) == 2
+    assert old_entry.exists()
+    with open(old_entry, 'rb') as f:
+        assert pickle.load(f).equals(df)
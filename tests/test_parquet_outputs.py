@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+ROOT = Path(__file__).resolve().parent.parent
+RAW_DIR = ROOT / 'data' / 'raw'
+
+sys.path.insert(0, str(ROOT / 'src' / 'scripts'))
+
+import extract_annual_reports_v2
+import extract_proxy_data
+import extract_quarterly_reports
+
+
+def assert_single_row_group(csv_file: Path):
+    parquet_file = pq.ParquetFile(csv_file.with_suffix('.parquet'))
+
+    assert parquet_file.metadata.num_row_groups == 1
+    assert parquet_file.metadata.num_rows == len(pd.read_csv(csv_file, low_memory=False))
+
+
+def test_annual_v2_parquet_outputs_are_single_row_groups(tmp_path):
+    assert extract_annual_reports_v2.process_all_annual_reports_v2(RAW_DIR / 'annual reports', tmp_path)
+
+    csv_files = sorted(tmp_path.glob('*.csv'))
+    assert csv_files
+    for csv_file in csv_files:
+        assert_single_row_group(csv_file)
+
+
+def test_quarterly_parquet_outputs_are_single_row_groups(tmp_path):
+    assert extract_quarterly_reports.process_all_quarterly_reports(RAW_DIR / 'quarterly reports', tmp_path)
+
+    csv_files = sorted(tmp_path.glob('*.csv'))
+    assert csv_files
+    for csv_file in csv_files:
+        assert_single_row_group(csv_file)
+
+
+def test_proxy_parquet_output_is_single_row_group(tmp_path):
+    output_file = tmp_path / 'proxy_data.csv'
+
+    assert extract_proxy_data.process_all_proxy_statements(RAW_DIR / 'proxies and info statements',
+                                                           output_file)
+
+    assert_single_row_group(output_file)